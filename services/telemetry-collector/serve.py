@@ -0,0 +1,149 @@
+import math, multiprocessing, os, shutil, signal, socket, time
+import uvicorn
+
+HOST    = os.getenv("HOST", "0.0.0.0")
+PORT    = int(os.getenv("PORT", "8080"))
+SHUTDOWN_TIMEOUT_S = float(os.getenv("SHUTDOWN_TIMEOUT_S", "20"))
+# the kubelet SIGKILLs terminationGracePeriod after preStop starts, and SIGTERM
+# only arrives once preStop is done; 0 means no pod budget is known
+TERMINATION_GRACE_S = float(os.getenv("TERMINATION_GRACE_PERIOD_S", "0"))
+PRESTOP_SLEEP_S     = float(os.getenv("PRESTOP_SLEEP_S", "0"))
+MULTIPROC_DIR      = os.getenv("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_QUOTA   = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+CGROUP_V1_PERIOD  = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+
+def _read(path):
+    with open(path) as f:
+        return f.read().strip()
+
+def cgroup_cpu_limit(v2_path=CGROUP_V2_CPU_MAX, v1_quota=CGROUP_V1_QUOTA, v1_period=CGROUP_V1_PERIOD):
+    """The container's CPU quota in cores, or None when unlimited or unknown."""
+    try:
+        quota, period = _read(v2_path).split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(_read(v1_quota))
+        return None if quota <= 0 else quota / int(_read(v1_period))
+    except (OSError, ValueError):
+        return None
+
+def available_cpus(**cgroup_paths):
+    # os.cpu_count() is the node's core count; a pod is bounded by its
+    # affinity mask and, under a CPU limit, by the CFS quota
+    cpus = len(os.sched_getaffinity(0))
+    limit = cgroup_cpu_limit(**cgroup_paths)
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+WORKERS = int(os.getenv("COLLECTOR_WORKERS", "1")) or available_cpus()
+
+def reuseport_socket(host, port):
+    # every worker binds its own listener; the kernel spreads new connections
+    # across them instead of all workers contending on one accept queue
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+def uvicorn_config():
+    return uvicorn.Config(
+        "app:app",
+        host=HOST,
+        port=PORT,
+        timeout_graceful_shutdown=int(SHUTDOWN_TIMEOUT_S),
+    )
+
+def ignore_drain_signal():
+    # SIGUSR1 (preStop) would kill a process whose app has not installed its
+    # handler yet; app.startup replaces this
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+
+def run_worker():
+    ignore_drain_signal()
+    uvicorn.Server(uvicorn_config()).run(sockets=[reuseport_socket(HOST, PORT)])
+
+def reset_multiproc_dir(path):
+    # stale *.db files from a previous run would be summed into the new scrape
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+def kill_after_s(drain_s, grace_s, prestop_s, margin_s=1.0):
+    """How long workers get to drain before the supervisor SIGKILLs them.
+
+    Within a pod the deadline ends before the kubelet's own SIGKILL, so the
+    supervisor still reaps workers and marks them dead.
+    """
+    budget = drain_s + 5
+    if grace_s:
+        budget = min(budget, grace_s - prestop_s - margin_s)
+    return max(0.0, budget)
+
+def supervise(workers):
+    """Runs `workers` shared-nothing uvicorn processes and restarts any that die.
+
+    SIGUSR1 (drain start) and SIGTERM/SIGINT are forwarded so every worker
+    drains on its own; workers still running after the drain deadline are killed.
+    """
+    # imported only after PROMETHEUS_MULTIPROC_DIR is set in the environment
+    from prometheus_client import multiprocess
+
+    ctx = multiprocessing.get_context("spawn")
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    def spawn():
+        p = ctx.Process(target=run_worker, daemon=False)
+        p.start()
+        return p
+
+    procs = [spawn() for _ in range(workers)]
+
+    def begin_drain(signum, frame):
+        for p in procs:
+            if p.is_alive():
+                os.kill(p.pid, signal.SIGUSR1)
+
+    signal.signal(signal.SIGUSR1, begin_drain)
+    while not stopping:
+        for i, p in enumerate(procs):
+            if not p.is_alive():
+                multiprocess.mark_process_dead(p.pid)
+                procs[i] = spawn()
+        time.sleep(0.5)
+
+    for p in procs:
+        if p.is_alive():
+            os.kill(p.pid, signal.SIGTERM)
+    deadline = time.monotonic() + kill_after_s(SHUTDOWN_TIMEOUT_S, TERMINATION_GRACE_S, PRESTOP_SLEEP_S)
+    for p in procs:
+        p.join(max(0.0, deadline - time.monotonic()))
+        if p.is_alive():
+            p.kill()
+            p.join()
+        multiprocess.mark_process_dead(p.pid)
+
+def main():
+    if WORKERS > 1:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = MULTIPROC_DIR
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        reset_multiproc_dir(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    if WORKERS <= 1:
+        ignore_drain_signal()
+        uvicorn.Server(uvicorn_config()).run()
+        return
+    supervise(WORKERS)
+
+if __name__ == "__main__":
+    main()
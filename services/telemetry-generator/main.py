@@ -1,4 +1,4 @@
-import asyncio, os, json, random
+import asyncio, os, json, logging, random, signal, time
 from datetime import datetime, timezone
 import aio_pika
 from prometheus_client import start_http_server, Counter, Gauge, Histogram
@@ -9,6 +9,7 @@ RATE=float(os.getenv("RATE_HZ","1"))
 SAT_COUNT=int(os.getenv("SAT_COUNT","8"))
 ORBIT=os.getenv("ORBIT","LEO")
 REGIONS=os.getenv("REGIONS","RU").split(",")
+SHUTDOWN_TIMEOUT_S=float(os.getenv("SHUTDOWN_TIMEOUT_S","20"))
 
 # --- Prometheus metrics ---
 GEN_TOTAL_BY_SAT = Counter(
@@ -61,8 +62,13 @@ PUBLISH_DURATION = Histogram(
     "Time to publish a single message",
 )
 
+# set when draining starts so a scrape can see it; the duration is logged at exit
+DRAIN_STARTED = Gauge("telemetry_generator_drain_started_unixtime", "Unix time the shutdown drain began, 0 while serving")
+
 CONFIG_RATE.set(RATE)
 CONFIG_SATS.set(SAT_COUNT)
+
+log = logging.getLogger("telemetry.generator")
 # -----------------------------------
 
 def generate_payload(sat_id: str, region: str) -> dict:
@@ -93,12 +99,24 @@ async def main():
     # Prometheus metrics endpoint on 9100
     start_http_server(9100)
 
+    # SIGUSR1 (preStop) stops publishing while the metrics endpoint keeps
+    # serving until SIGTERM, so the drain gauge can be scraped
+    stop = asyncio.Event()
+    terminate = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGUSR1, stop.set)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, lambda: (stop.set(), terminate.set()))
+
     conn=await aio_pika.connect_robust(RABBITMQ_URL)
     async with conn:
         ch=await conn.channel()
         await ch.declare_queue(QUEUE_NAME,durable=True)
-        while True:
+        while not stop.is_set():
             for i in range(SAT_COUNT):
+                # stop between publishes; every publish already awaited is broker-confirmed
+                if stop.is_set():
+                    break
                 sat_id = f"SAT-{i:03d}"
                 region = random.choice(REGIONS)
                 msg = generate_payload(sat_id, region)
@@ -117,7 +135,17 @@ async def main():
                 UPLINK_HIST.labels(sat_id=sat_id).observe(msg["link"]["uplink_mbps"])
                 DOWNLINK_HIST.labels(sat_id=sat_id).observe(msg["link"]["downlink_mbps"])
 
-            await asyncio.sleep(1.0/max(RATE,0.1))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1.0/max(RATE,0.1))
+            except asyncio.TimeoutError:
+                pass
+
+        DRAIN_STARTED.set(time.time())
+        drain_start = time.perf_counter()
+        await asyncio.wait_for(ch.close(), SHUTDOWN_TIMEOUT_S)
+    log.info("drained in %.2fs", time.perf_counter() - drain_start)
+    await terminate.wait()
 
 if __name__=="__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     asyncio.run(main())
@@ -0,0 +1,108 @@
+import asyncio, time
+from prometheus_client import Gauge
+
+queue_depth       = Gauge("telemetry_queue_depth_messages", "Ready messages in the raw queue (passive declare)")
+queue_consumers   = Gauge("telemetry_queue_consumers", "Consumers attached to the raw queue")
+utilization_ratio = Gauge("telemetry_consumer_utilization_ratio", "Share of wall time this replica spent handling messages")
+max_rate          = Gauge("telemetry_processor_max_sustainable_rate", "Observed msgs/s this replica sustains when fully busy")
+drain_eta_s       = Gauge("telemetry_backlog_drain_seconds_estimate", "Estimated seconds for all consumers to drain the backlog")
+
+async def open_consumer_channel(conn, prefetch_count):
+    """Opens the consumer channel with a bounded prefetch.
+
+    Without a QoS limit RabbitMQ pushes the whole backlog to the consumer as
+    unacked deliveries: the passive declare then reports ~0 ready messages
+    exactly when there is a backlog, and replicas added by the autoscaler get
+    no share of it.
+    """
+    ch = await conn.channel()
+    await ch.set_qos(prefetch_count=prefetch_count)
+    return ch
+
+def estimate_drain_seconds(depth, depth_rate, consumers, capacity, own_rate, cap_s):
+    """Seconds until `depth` reaches zero, capped at `cap_s`.
+
+    Every consumer is assumed to behave like this replica: the spare capacity of
+    all consumers, minus how fast the backlog is growing, is the net drain rate.
+    """
+    if depth <= 0:
+        return 0.0
+    net_rate = consumers * (capacity - own_rate) - depth_rate
+    if consumers <= 0 or net_rate <= 0:
+        return cap_s
+    return min(cap_s, depth / net_rate)
+
+class CapacitySampler:
+    """Samples queue depth and this replica's throughput for autoscaling gauges.
+
+    The consumer reports the time spent on each message through `record`; every
+    `interval_s` the sampler turns that into utilization and capacity and does a
+    passive declare of the queue for depth and consumer count.
+    """
+
+    def __init__(self, queue_name, interval_s=5.0, smoothing=0.3, eta_cap_s=3600.0):
+        self.queue_name = queue_name
+        self.interval_s = interval_s
+        self.smoothing = smoothing
+        self.eta_cap_s = eta_cap_s
+        self.capacity = 0.0
+        self._busy_s = 0.0
+        self._handled = 0
+        self._last_depth = None
+        self._channel = None
+
+    def record(self, busy_s):
+        self._busy_s += busy_s
+        self._handled += 1
+
+    def update(self, window_s, depth, consumers):
+        busy_s, handled = self._busy_s, self._handled
+        self._busy_s, self._handled = 0.0, 0
+
+        own_rate = handled / window_s
+        utilization = min(1.0, busy_s / window_s)
+        if handled and busy_s > 0:
+            window_capacity = handled / busy_s
+            if self.capacity:
+                self.capacity += self.smoothing * (window_capacity - self.capacity)
+            else:
+                self.capacity = window_capacity
+
+        depth_rate = 0.0
+        if self._last_depth is not None:
+            depth_rate = (depth - self._last_depth) / window_s
+        self._last_depth = depth
+
+        queue_depth.set(depth)
+        queue_consumers.set(consumers)
+        utilization_ratio.set(utilization)
+        max_rate.set(self.capacity)
+        # until this replica has handled messages its capacity is unknown and the
+        # estimate would read as "never drains", scaling straight to the maximum
+        if self.capacity:
+            drain_eta_s.set(estimate_drain_seconds(
+                depth, depth_rate, consumers, self.capacity, own_rate, self.eta_cap_s,
+            ))
+
+    async def _declare(self, conn):
+        # a dedicated channel: a failed passive declare closes its channel,
+        # which must never be the one the consumer is on
+        if self._channel is None or self._channel.is_closed:
+            self._channel = await conn.channel()
+        # robust=False: a robust declare registers the queue on the channel for
+        # redeclaring after reconnects, one more object on every sample
+        q = await self._channel.declare_queue(self.queue_name, passive=True, robust=False)
+        return q.declaration_result.message_count, q.declaration_result.consumer_count
+
+    async def run(self, conn):
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(self.interval_s)
+            try:
+                depth, consumers = await self._declare(conn)
+            except Exception:
+                self._channel = None
+                continue
+            now = time.perf_counter()
+            self.update(now - last, depth, consumers)
+            last = now
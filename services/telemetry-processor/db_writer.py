@@ -0,0 +1,96 @@
+import asyncio, time
+import asyncpg
+from prometheus_client import Histogram
+
+INSERT_SQL = "INSERT INTO telemetry(data) VALUES($1::jsonb)"
+SCHEMA_CHECK_SQL = "SELECT to_regclass('telemetry') IS NOT NULL"
+
+# jsonb binary wire format: 1-byte version header followed by the JSON text
+JSONB_VERSION = b"\x01"
+
+pool_wait_s = Histogram(
+    "telemetry_db_pool_wait_seconds",
+    "Time spent waiting for a pooled DB connection",
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1],
+)
+statement_s = Histogram(
+    "telemetry_db_statement_seconds",
+    "Prepared INSERT statement latency seconds",
+    buckets=[0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1],
+)
+
+def encode_jsonb(body):
+    # message bodies arrive as raw JSON bytes; ship them without re-serializing
+    if isinstance(body, str):
+        body = body.encode()
+    return JSONB_VERSION + bytes(body)
+
+def decode_jsonb(data: bytes) -> bytes:
+    return data[1:]
+
+async def _init_connection(conn):
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=encode_jsonb,
+        decoder=decode_jsonb,
+        schema="pg_catalog",
+        format="binary",
+    )
+
+class DbWriter:
+    """Owns the processor's Postgres pool and writes raw message bodies as jsonb rows.
+
+    INSERTs go through asyncpg's per-connection statement cache, so each pooled
+    connection prepares the statement once and reuses it for every row.
+    """
+
+    def __init__(self, dsn, min_size=2, max_size=10, statement_cache_size=100):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.pool = None
+        self.healthy = False
+
+    async def start(self):
+        self.pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=self.statement_cache_size,
+            max_inactive_connection_lifetime=0,
+            init=_init_connection,
+        )
+
+    async def write(self, body):
+        wait_start = time.perf_counter()
+        async with self.pool.acquire() as c:
+            pool_wait_s.observe(time.perf_counter() - wait_start)
+            stmt_start = time.perf_counter()
+            await c.execute(INSERT_SQL, body)
+            statement_s.observe(time.perf_counter() - stmt_start)
+
+    async def check(self, timeout=2.0):
+        """True when Postgres answers and the telemetry table exists."""
+        try:
+            async with self.pool.acquire(timeout=timeout) as c:
+                return bool(await c.fetchval(SCHEMA_CHECK_SQL, timeout=timeout))
+        except Exception:
+            return False
+
+    async def wait_ready(self, interval_s=1.0):
+        # the schema is applied by migrate.py; consuming before it exists would
+        # fail every INSERT
+        while not await self.check():
+            await asyncio.sleep(interval_s)
+        self.healthy = True
+
+    async def monitor(self, interval_s=5.0):
+        while True:
+            self.healthy = await self.check()
+            await asyncio.sleep(interval_s)
+
+    async def close(self):
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
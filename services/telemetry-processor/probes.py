@@ -0,0 +1,72 @@
+import asyncio, json, threading, time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import make_server, WSGIServer, WSGIRequestHandler
+from prometheus_client import make_wsgi_app
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+class _SilentHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+class Probes:
+    """Serves /healthz and /readyz next to /metrics on the processor's metrics port.
+
+    The HTTP server runs in a daemon thread, so liveness is judged by a heartbeat
+    the event loop must keep refreshing; readiness runs the registered checks.
+    """
+
+    def __init__(self, stale_after_s=30.0):
+        self.stale_after_s = stale_after_s
+        self.checks = {}
+        self.draining = False
+        self.heartbeat = time.monotonic()
+
+    def add_check(self, name, check):
+        self.checks[name] = check
+
+    def alive(self):
+        return time.monotonic() - self.heartbeat < self.stale_after_s
+
+    def ready(self):
+        status = {}
+        for name, check in self.checks.items():
+            try:
+                status[name] = bool(check())
+            except Exception:
+                status[name] = False
+        status["draining"] = self.draining
+        ok = bool(self.checks) and all(status[n] for n in self.checks) and not self.draining
+        return ok, status
+
+    async def beat(self, interval_s=1.0):
+        while True:
+            self.heartbeat = time.monotonic()
+            await asyncio.sleep(interval_s)
+
+    def wsgi_app(self):
+        metrics_app = make_wsgi_app()
+
+        def app(environ, start_response):
+            path = environ.get("PATH_INFO", "")
+            if path == "/healthz":
+                ok = self.alive()
+                body = {"alive": ok}
+            elif path == "/readyz":
+                ok, body = self.ready()
+            else:
+                return metrics_app(environ, start_response)
+            start_response(
+                "200 OK" if ok else "503 Service Unavailable",
+                [("Content-Type", "application/json")],
+            )
+            return [json.dumps(body).encode()]
+
+        return app
+
+    def serve(self, port, addr="0.0.0.0"):
+        httpd = make_server(addr, port, self.wsgi_app(), _ThreadingWSGIServer, handler_class=_SilentHandler)
+        t = threading.Thread(target=httpd.serve_forever, daemon=True)
+        t.start()
+        return httpd
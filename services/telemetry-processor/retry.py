@@ -0,0 +1,11 @@
+import asyncio
+
+async def connect_with_retry(connect, attempts=60, delay=1):
+    last=None
+    for _ in range(attempts):
+        try:
+            return await connect()
+        except Exception as e:
+            last=e
+            await asyncio.sleep(delay)
+    raise last
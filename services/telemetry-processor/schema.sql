@@ -3,3 +3,6 @@ CREATE TABLE IF NOT EXISTS telemetry (
   data JSONB NOT NULL,
   ts   TIMESTAMPTZ NOT NULL DEFAULT now()
 );
+
+-- CONCURRENTLY keeps inserts flowing while the index builds on a large table
+CREATE INDEX CONCURRENTLY IF NOT EXISTS telemetry_gin ON telemetry USING GIN (data);
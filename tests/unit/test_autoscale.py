@@ -0,0 +1,137 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../services/telemetry-processor'))
+
+import autoscale
+
+
+def test_estimate_drain_seconds():
+    # 2 consumers, each can do 100 msg/s but is handling 40 msg/s, backlog flat
+    assert autoscale.estimate_drain_seconds(1200, 0, 2, 100, 40, 3600) == 10
+    # a growing backlog eats into the spare capacity
+    assert autoscale.estimate_drain_seconds(1200, 60, 2, 100, 40, 3600) == 20
+    assert autoscale.estimate_drain_seconds(0, 50, 2, 100, 40, 3600) == 0
+    # no spare capacity or no consumers: capped instead of infinite
+    assert autoscale.estimate_drain_seconds(1200, 0, 2, 100, 100, 3600) == 3600
+    assert autoscale.estimate_drain_seconds(1200, 0, 0, 100, 40, 3600) == 3600
+
+
+def test_sampler_update_sets_gauges():
+    sampler = autoscale.CapacitySampler("telemetry.raw", eta_cap_s=3600)
+    # 50 messages at 10 ms each during a 5 s window: 10% busy, 100 msg/s capacity
+    for _ in range(50):
+        sampler.record(0.01)
+    sampler.update(5.0, depth=900, consumers=1)
+
+    assert autoscale.queue_depth._value.get() == 900
+    assert autoscale.queue_consumers._value.get() == 1
+    assert abs(autoscale.utilization_ratio._value.get() - 0.1) < 1e-9
+    assert abs(autoscale.max_rate._value.get() - 100) < 1e-6
+    # spare capacity 100 - 10 = 90 msg/s
+    assert abs(autoscale.drain_eta_s._value.get() - 10) < 1e-6
+
+    # an idle window keeps the learned capacity
+    sampler.update(5.0, depth=900, consumers=1)
+    assert abs(autoscale.max_rate._value.get() - 100) < 1e-6
+    assert autoscale.utilization_ratio._value.get() == 0
+
+
+class FakeBroker:
+    """Models one queue: RabbitMQ pushes ready messages to consumers up to their prefetch."""
+
+    def __init__(self, backlog):
+        self.ready = backlog
+        self.unacked = 0
+        self.consumers = 0
+
+    def attach_consumer(self, channel):
+        self.consumers += 1
+        limit = channel.prefetch_count or self.ready  # 0 = unlimited
+        pushed = min(limit, self.ready)
+        self.ready -= pushed
+        self.unacked += pushed
+
+
+class FakeDeclareOk:
+    def __init__(self, broker):
+        self.message_count = broker.ready
+        self.consumer_count = broker.consumers
+
+
+class FakeQueue:
+    def __init__(self, broker):
+        self.declaration_result = FakeDeclareOk(broker)
+
+
+class FakeChannel:
+    def __init__(self, broker):
+        self.broker = broker
+        self.prefetch_count = 0
+        self.is_closed = False
+        self.registered = []
+
+    async def set_qos(self, prefetch_count):
+        self.prefetch_count = prefetch_count
+
+    async def declare_queue(self, name, passive=False, robust=True):
+        # like RobustChannel: robust declares are kept for redeclaring on reconnect
+        if robust:
+            self.registered.append(name)
+        return FakeQueue(self.broker)
+
+
+class FakeConnection:
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def channel(self):
+        return FakeChannel(self.broker)
+
+
+def test_bounded_prefetch_keeps_backlog_visible_as_queue_depth():
+    broker = FakeBroker(backlog=1000)
+    conn = FakeConnection(broker)
+    sampler = autoscale.CapacitySampler("telemetry.raw")
+
+    async def run():
+        ch = await autoscale.open_consumer_channel(conn, prefetch_count=32)
+        broker.attach_consumer(ch)
+        sampler.record(0.01)
+        depth, consumers = await sampler._declare(conn)
+        sampler.update(5.0, depth, consumers)
+
+    asyncio.run(run())
+
+    assert broker.unacked == 32
+    assert autoscale.queue_depth._value.get() == 1000 - 32
+    assert autoscale.drain_eta_s._value.get() > 0
+
+
+def test_depth_samples_do_not_accumulate_robust_queues():
+    broker = FakeBroker(backlog=10)
+    conn = FakeConnection(broker)
+    sampler = autoscale.CapacitySampler("telemetry.raw")
+
+    async def run():
+        depths = []
+        for ready in (10, 20, 30):
+            broker.ready = ready
+            depths.append((await sampler._declare(conn))[0])
+        return depths
+
+    # every sample is a fresh Queue.DeclareOk, and nothing piles up on the channel
+    assert asyncio.run(run()) == [10, 20, 30]
+    assert sampler._channel.registered == []
+
+
+def test_unknown_capacity_does_not_report_a_capped_drain_estimate():
+    autoscale.drain_eta_s.set(0)
+    sampler = autoscale.CapacitySampler("telemetry.raw", eta_cap_s=3600)
+
+    # a fresh replica sees a backlog before it has handled anything
+    sampler.update(5.0, depth=5000, consumers=3)
+
+    assert autoscale.queue_depth._value.get() == 5000
+    assert autoscale.drain_eta_s._value.get() == 0
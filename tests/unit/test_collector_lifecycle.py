@@ -0,0 +1,130 @@
+import asyncio
+import importlib.util
+import os
+import pathlib
+import signal
+import subprocess
+import sys
+
+from prometheus_client import generate_latest, multiprocess
+
+
+def load_collector_module():
+    root = pathlib.Path(__file__).resolve().parents[2]
+    module_path = root / "services" / "telemetry-collector" / "app.py"
+    spec = importlib.util.spec_from_file_location("telemetry_collector", str(module_path))
+    mod = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(mod)  # type: ignore[attr-defined]
+    return mod
+
+
+collector = load_collector_module()
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_sigusr1_starts_drain_while_still_serving(caplog):
+    conn = FakeConnection()
+    state = collector.app.state
+    state.draining = False
+    drain_started_ts = collector.drain_started_ts
+    drain_started_ts.set(0)
+
+    async def run():
+        await collector.startup()
+        # the preStop hook signals before the kubelet sends SIGTERM
+        os.kill(os.getpid(), signal.SIGUSR1)
+        await asyncio.sleep(0.05)
+        assert state.draining
+        assert drain_started_ts._value.get() > 0
+        assert (await collector.readyz()).status_code == 503
+
+        state.conn = conn
+        await collector.shutdown()
+
+    with caplog.at_level("INFO", logger="uvicorn.error"):
+        asyncio.run(run())
+
+    assert conn.closed
+    assert state.connect_task.cancelled()
+    assert any(r.getMessage().startswith("drained in") for r in caplog.records)
+
+
+class FakeChannel:
+    def __init__(self, closed=False):
+        self.is_closed = closed
+
+
+def test_readyz_tracks_broker_and_draining():
+    state = collector.app.state
+    state.draining = False
+    state.channels, state.exchanges = [], []
+    assert asyncio.run(collector.readyz()).status_code == 503
+
+    state.channels, state.exchanges = [FakeChannel(), FakeChannel()], [object(), object()]
+    assert asyncio.run(collector.readyz()).status_code == 200
+
+    state.channels[1] = FakeChannel(closed=True)
+    assert asyncio.run(collector.readyz()).status_code == 503
+
+    state.channels[1] = FakeChannel()
+    state.draining = True
+    assert asyncio.run(collector.readyz()).status_code == 503
+
+
+def test_publishes_rotate_over_channel_pool():
+    state = collector.app.state
+    state.exchanges, state.next_ex = ["ex0", "ex1", "ex2"], 0
+    picked = [collector.next_exchange() for _ in range(6)]
+    assert sorted(picked[:3]) == ["ex0", "ex1", "ex2"]
+    assert picked[:3] == picked[3:]
+
+
+def run_worker_process(multiproc_dir, script):
+    collector_dir = pathlib.Path(collector.__file__).parent
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(multiproc_dir))
+    proc = subprocess.run(
+        [sys.executable, "-c", "import app\n" + script],
+        cwd=collector_dir, env=env, check=True, capture_output=True, text=True,
+    )
+    return proc.stdout
+
+
+def sample(text, name):
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.split()[1])
+    return None
+
+
+def test_metrics_merge_values_from_all_workers(tmp_path, monkeypatch):
+    # two worker processes writing into the same multiprocess directory
+    run_worker_process(tmp_path, "app.ingest_total.inc(3); app.last_ingest_ts.set(100)")
+    run_worker_process(tmp_path, "app.ingest_total.inc(4); app.last_ingest_ts.set(200)")
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    text = generate_latest(collector.metrics_registry()).decode()
+
+    assert sample(text, "telemetry_http_ingest_total") == 7
+    assert sample(text, "telemetry_http_last_ingest_unixtime") == 200
+
+
+def test_dead_worker_drops_out_of_live_gauges(tmp_path, monkeypatch):
+    out = run_worker_process(tmp_path, "import os; app.drain_started_ts.set(123); print(os.getpid())")
+    pid = int(out.split()[-1])
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    text = generate_latest(collector.metrics_registry()).decode()
+    assert sample(text, "telemetry_collector_drain_started_unixtime") == 123
+
+    # what serve.py's supervisor does when a worker exits
+    multiprocess.mark_process_dead(pid, str(tmp_path))
+    text = generate_latest(collector.metrics_registry()).decode()
+    assert sample(text, "telemetry_collector_drain_started_unixtime") is None
@@ -0,0 +1,104 @@
+import asyncio
+import importlib.util
+import json
+import pathlib
+
+
+def load_db_writer_module():
+    root = pathlib.Path(__file__).resolve().parents[2]
+    module_path = root / "services" / "telemetry-processor" / "db_writer.py"
+    spec = importlib.util.spec_from_file_location("telemetry_db_writer", str(module_path))
+    mod = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(mod)  # type: ignore[attr-defined]
+    return mod
+
+
+# metrics register globally, so the module can only be loaded once per process
+db_writer = load_db_writer_module()
+
+
+class FakeConn:
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, query, *args):
+        self.calls.append((query, args))
+
+
+class FakeAcquire:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConn()
+
+    def acquire(self):
+        return FakeAcquire(self.conn)
+
+
+def test_jsonb_codec_passes_raw_bytes_through():
+    body = json.dumps({"sat_id": "SAT-001", "battery": 80.5}).encode()
+
+    wire = db_writer.encode_jsonb(body)
+    assert wire == b"\x01" + body
+    assert db_writer.decode_jsonb(wire) == body
+    assert db_writer.encode_jsonb(body.decode()) == wire
+
+
+def test_write_sends_message_body_unchanged():
+    writer = db_writer.DbWriter("postgresql://unused", min_size=1, max_size=4, statement_cache_size=10)
+    writer.pool = FakePool()
+    body = b'{"sat_id": "SAT-002"}'
+
+    asyncio.run(writer.write(body))
+
+    assert writer.pool.conn.calls == [(db_writer.INSERT_SQL, (body,))]
+
+
+class FlakyConn(FakeConn):
+    def __init__(self, answers):
+        super().__init__()
+        self.answers = list(answers)
+
+    async def fetchval(self, query, timeout=None):
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class FlakyPool(FakePool):
+    def __init__(self, answers):
+        self.conn = FlakyConn(answers)
+
+    def acquire(self, timeout=None):
+        return FakeAcquire(self.conn)
+
+
+def test_check_reflects_db_and_schema_state():
+    writer = db_writer.DbWriter("postgresql://unused")
+    writer.pool = FlakyPool([True, False, ConnectionError("db down")])
+
+    assert asyncio.run(writer.check()) is True
+    # reachable, but the telemetry table has not been migrated yet
+    assert asyncio.run(writer.check()) is False
+    assert asyncio.run(writer.check()) is False
+
+
+def test_wait_ready_blocks_until_schema_exists():
+    writer = db_writer.DbWriter("postgresql://unused")
+    writer.pool = FlakyPool([ConnectionError("db down"), False, True])
+
+    asyncio.run(writer.wait_ready(interval_s=0))
+
+    assert writer.healthy
+    assert writer.pool.conn.answers == []
@@ -0,0 +1,99 @@
+import asyncio
+import importlib.util
+import os
+import pathlib
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../services/telemetry-processor'))
+
+
+def load_migrate_module():
+    root = pathlib.Path(__file__).resolve().parents[2]
+    module_path = root / "services" / "telemetry-processor" / "migrate.py"
+    spec = importlib.util.spec_from_file_location("telemetry_migrate", str(module_path))
+    mod = importlib.util.module_from_spec(spec)
+    assert spec and spec.loader
+    spec.loader.exec_module(mod)  # type: ignore[attr-defined]
+    return mod
+
+
+migrate = load_migrate_module()
+SCHEMA = (pathlib.Path(migrate.__file__).with_name("schema.sql")).read_text()
+
+
+class FakeConn:
+    def __init__(self, invalid_indexes=(), lock_answers=(True,)):
+        self.invalid_indexes = [(name,) for name in invalid_indexes]
+        self.lock_answers = list(lock_answers)
+        self.executed = []
+        self.closed = False
+
+    async def execute(self, query, *args):
+        self.executed.append(query)
+
+    async def fetchval(self, query, *args):
+        self.executed.append(query)
+        return self.lock_answers.pop(0)
+
+    async def fetch(self, query, *args):
+        return self.invalid_indexes
+
+    async def close(self):
+        self.closed = True
+
+
+def test_schema_statements_split_and_index_is_concurrent():
+    stmts = migrate.split_statements(SCHEMA)
+    assert len(stmts) == 2
+    assert stmts[0].startswith("CREATE TABLE IF NOT EXISTS telemetry")
+    assert stmts[1].startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS telemetry_gin")
+
+
+def test_invalid_index_is_dropped_before_rebuild_under_lock():
+    conn = FakeConn(invalid_indexes=["telemetry_gin"])
+    asyncio.run(migrate.migrate(conn, SCHEMA))
+
+    executed = conn.executed
+    assert executed[0] == "SELECT pg_try_advisory_lock($1)"
+    assert executed[1] == 'DROP INDEX CONCURRENTLY IF EXISTS "telemetry_gin"'
+    assert executed[-2].startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS telemetry_gin")
+    assert executed[-1] == "SELECT pg_advisory_unlock($1)"
+
+
+def test_valid_schema_only_reapplies_idempotent_ddl():
+    conn = FakeConn()
+    asyncio.run(migrate.migrate(conn, SCHEMA))
+    assert not any(q.startswith("DROP") for q in conn.executed)
+
+
+def test_lock_is_polled_instead_of_blocking():
+    # another pod holds the lock twice before releasing it
+    conn = FakeConn(lock_answers=[False, False, True])
+    asyncio.run(migrate.migrate(conn, SCHEMA, lock_poll_s=0))
+
+    assert conn.lock_answers == []
+    assert "SELECT pg_advisory_lock($1)" not in conn.executed
+    assert conn.executed[:3] == ["SELECT pg_try_advisory_lock($1)"] * 3
+    assert conn.executed[-1] == "SELECT pg_advisory_unlock($1)"
+
+
+def test_main_retries_until_postgres_accepts_connections(monkeypatch):
+    conn = FakeConn()
+    attempts = []
+
+    async def connect(dsn):
+        attempts.append(dsn)
+        if len(attempts) < 3:
+            raise ConnectionRefusedError("postgres is still starting")
+        return conn
+
+    async def no_sleep(_):
+        pass
+
+    monkeypatch.setattr(migrate.asyncpg, "connect", connect)
+    monkeypatch.setattr(migrate.asyncio, "sleep", no_sleep)
+    asyncio.run(migrate.main())
+
+    assert len(attempts) == 3
+    assert conn.closed
+    assert conn.executed[-1] == "SELECT pg_advisory_unlock($1)"
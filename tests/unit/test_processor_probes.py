@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../services/telemetry-processor'))
+
+from probes import Probes
+
+
+def call(app, path):
+    captured = {}
+
+    def start_response(status, headers):
+        captured["status"] = status
+
+    body = b"".join(app({"PATH_INFO": path, "REQUEST_METHOD": "GET"}, start_response))
+    return captured["status"], body
+
+
+def test_readyz_requires_all_checks_and_not_draining():
+    probes = Probes()
+    app = probes.wsgi_app()
+
+    # nothing registered yet means startup has not finished
+    assert call(app, "/readyz")[0].startswith("503")
+
+    db_up = {"value": False}
+    probes.add_check("db", lambda: db_up["value"])
+    probes.add_check("broker", lambda: True)
+    status, body = call(app, "/readyz")
+    assert status.startswith("503")
+    assert json.loads(body)["db"] is False
+
+    db_up["value"] = True
+    assert call(app, "/readyz")[0].startswith("200")
+
+    probes.draining = True
+    assert call(app, "/readyz")[0].startswith("503")
+
+
+def test_healthz_fails_when_heartbeat_is_stale():
+    probes = Probes(stale_after_s=5)
+    app = probes.wsgi_app()
+    assert call(app, "/healthz")[0].startswith("200")
+
+    probes.heartbeat = time.monotonic() - 10
+    assert call(app, "/healthz")[0].startswith("503")